@@ -1,37 +1,56 @@
 import os
 from typing import Literal
 
-import dspy
-from dotenv import load_dotenv
-from grammarlee.judge import GrammarLeeJudge
-from grammarlee.parser import parse_document
-from grammarlee.signature import GrammarLeeSignature
 
-
-load_dotenv()
-
-MODEL_ID = os.getenv("MODEL_ID", "openrouter/google/gemini-2.0-flash-001")
-lm = dspy.LM(MODEL_ID, api_key=os.environ["APIKEY"], temperature=0.5)
-dspy.settings.configure(lm=lm)
-editor = dspy.Predict(GrammarLeeSignature)
-
-JUDGE_MODEL_ID = os.getenv("MODEL_ID", "openrouter/google/gemini-2.0-flash-001")
-judge_lm = dspy.LM(JUDGE_MODEL_ID, api_key=os.environ["APIKEY"], temperature=0.0)
-judge = dspy.Predict(GrammarLeeJudge)
-judge.set_lm(judge_lm)
-
-
-def main(edit_level: Literal["light", "medium", "heavy"] = "heavy"):
-    text = "Da studnet are bored"
-    pred = editor(text=text, edit_level=edit_level)
-
-    result = parse_document(pred, text)
-    _eval = judge(
-        original_text=text, edited_text=result.final_text, edit_level=edit_level
-    )
-    print(result)
-    print(_eval)
+def main(
+    texts: list[str], edit_level: Literal["light", "medium", "heavy"] = "heavy"
+):
+    # dspy pulls in litellm and its provider modules (~seconds of import
+    # work); defer it so importing this module stays cheap for workers
+    import dspy
+    from dotenv import load_dotenv
+    from grammarlee.judge import GrammarLeeJudge
+    from grammarlee.parser import parse_document
+    from grammarlee.signature import GrammarLeeSignature
+
+    load_dotenv()
+
+    model_id = os.getenv("MODEL_ID", "openrouter/google/gemini-2.0-flash-001")
+    lm = dspy.LM(model_id, api_key=os.environ["APIKEY"], temperature=0.5)
+    dspy.settings.configure(lm=lm)
+    editor = dspy.Predict(GrammarLeeSignature)
+
+    judge_model_id = os.getenv("MODEL_ID", "openrouter/google/gemini-2.0-flash-001")
+    judge_lm = dspy.LM(judge_model_id, api_key=os.environ["APIKEY"], temperature=0.0)
+    judge = dspy.Predict(GrammarLeeJudge)
+    judge.set_lm(judge_lm)
+
+    # Submit the whole batch at once: dspy's batch() runs the predictor over
+    # a thread pool, so the per-request HTTP overhead overlaps instead of
+    # serializing one round trip per text.
+    edit_examples = [
+        dspy.Example(text=text, edit_level=edit_level).with_inputs(
+            "text", "edit_level"
+        )
+        for text in texts
+    ]
+    preds = editor.batch(edit_examples)
+
+    results = [parse_document(pred, text) for pred, text in zip(preds, texts)]
+
+    # Judge calls are independent of each other too, so batch them the same way
+    judge_examples = [
+        dspy.Example(
+            original_text=text, edited_text=result.final_text, edit_level=edit_level
+        ).with_inputs("original_text", "edited_text", "edit_level")
+        for text, result in zip(texts, results)
+    ]
+    evals = judge.batch(judge_examples)
+
+    for result, _eval in zip(results, evals):
+        print(result)
+        print(_eval)
 
 
 if __name__ == "__main__":
-    main(edit_level="medium")
+    main(["Da studnet are bored"], edit_level="medium")
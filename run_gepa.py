@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -10,6 +11,15 @@ from grammarlee.optimize import load_grammar_dataset, optimize_with_gepa
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run GEPA optimization")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Threads for parallel candidate evaluation (bound by API rate limits)",
+    )
+    args = parser.parse_args()
+
     load_dotenv()
 
     if "APIKEY" not in os.environ:
@@ -22,18 +32,25 @@ def main():
     split_point = int(0.7 * len(dataset))
     train_set = dataset[:split_point]
     val_set = dataset[split_point:]
+    # The splits alias the same Example objects; drop the combined list so
+    # only the two slices' pointer arrays stay alive
+    del dataset
 
     print(f"Training: {len(train_set)}, Validation: {len(val_set)}")
     print("Running GEPA optimization...")
 
     try:
-        optimized_program = optimize_with_gepa(train_set, val_set)
+        optimized_program = optimize_with_gepa(
+            train_set, val_set, num_threads=args.workers
+        )
         optimized_program.save("optimized_grammar_program.json")
         print("Optimization complete. Saved to optimized_grammar_program.json")
 
         # Quick test
+        # The program is a ChainOfThought over GrammarLeeSignature, so the
+        # prediction always carries edited_text; no need for getattr fallback
         result = optimized_program(text="Da studnet are bored", edit_level="medium")
-        print(f"Test result: {getattr(result, 'edited_text', result)}")
+        print(f"Test result: {result.edited_text}")
 
         return 0
     except Exception as e:
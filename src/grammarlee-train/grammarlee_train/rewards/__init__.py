@@ -0,0 +1,37 @@
+"""
+GrammarLee reward package.
+
+Exports resolve lazily (PEP 562) so that importing the package doesn't
+pull in yaml or the scoring modules until they're actually used.
+"""
+
+__all__ = [
+    "GrammarLeeReward",
+    "SingleEvaluation",
+    "make_reward_function",
+    "RewardConfig",
+    "load_config",
+    "save_config",
+    "compute_reward",
+]
+
+_EXPORTS = {
+    "GrammarLeeReward": "reward_fn",
+    "SingleEvaluation": "reward_fn",
+    "make_reward_function": "reward_fn",
+    "RewardConfig": "weights",
+    "load_config": "weights",
+    "save_config": "weights",
+    "compute_reward": "aggregate",
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    module = import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # cache so __getattr__ runs once per name
+    return value
@@ -4,16 +4,18 @@ Clean aggregation with individually addressable component scores.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List
 
 from grammarlee import ParseResult
+from .weights import RewardConfig
 from .components import (
-    ComponentScore, score_has_backmatter, score_no_parse_errors,
-    score_anchors_covered, score_action_consistency, score_valid_categories,
-    score_comment_length, score_no_duplicate_ids, clamp01
+    ComponentScore, EditScan, _scan_edits, score_has_backmatter,
+    score_no_parse_errors, score_anchors_covered, score_action_consistency,
+    score_valid_categories, score_comment_length, score_no_duplicate_ids,
+    clamp01
 )
 
-@dataclass
+@dataclass(slots=True)
 class ComponentScores:
     """Individual component scores before weighting."""
     has_backmatter: ComponentScore
@@ -36,7 +38,7 @@ class ComponentScores:
             self.no_duplicate_ids
         ]
     
-    def compute(self, config: Dict) -> RewardBreakdown:
+    def compute(self, config: RewardConfig) -> RewardBreakdown:
         """Apply weights and compute final reward."""
         components = self.to_list()
         notes = []
@@ -45,12 +47,12 @@ class ComponentScores:
         gated = False
         
         # Gate on parse errors
-        if config.get("gate_on_parse_errors", True) and self.no_parse_errors.value == 0.0:
+        if config.gate_on_parse_errors and self.no_parse_errors.value == 0.0:
             gated = True
             notes.append("Gated due to parse errors")
         
         # Gate on duplicate IDs (optional)
-        elif config.get("gate_on_duplicate_ids", False) and self.no_duplicate_ids.value < 1.0:
+        elif config.gate_on_duplicate_ids and self.no_duplicate_ids.value < 1.0:
             gated = True
             notes.append("Gated due to duplicate IDs")
         
@@ -60,16 +62,16 @@ class ComponentScores:
         if gated:
             return RewardBreakdown(None, True, components, 0.0, notes)
         
-        # Apply weights and compute weighted average
-        weights = config.get("weights", {})
+        # Apply weights and compute weighted average. The weight vector is
+        # precomputed at config load, aligned with to_list() order, so this
+        # is one zip pass instead of a dict lookup per component.
+        wvec = config.weight_vec
+        total_weight = config.total_weight
+
         total_weighted = 0.0
-        total_weight = 0.0
-        
-        for comp in components:
-            weight = weights.get(comp.name, 1.0)  # Default weight of 1.0
+        for weight, comp in zip(wvec, components):
             total_weighted += weight * comp.value
-            total_weight += weight
-        
+
         reward = total_weighted / total_weight if total_weight > 0 else 0.0
         reward = clamp01(reward)
         
@@ -81,7 +83,7 @@ class ComponentScores:
         
         return RewardBreakdown(None, False, components, reward, notes)
 
-@dataclass
+@dataclass(slots=True)
 class RewardBreakdown:
     parse_result: ParseResult | None  # Optional for flexibility
     gated: bool
@@ -89,19 +91,36 @@ class RewardBreakdown:
     reward: float
     notes: List[str]
 
-def compute_component_scores(parse_result: ParseResult, config: Dict) -> ComponentScores:
-    """Compute individual component scores."""
+def compute_component_scores(parse_result: ParseResult, config: RewardConfig,
+                             scan: EditScan | None = None) -> ComponentScores:
+    """Compute individual component scores from one fused pass over the edits."""
+    if scan is None:
+        scan = _scan_edits(parse_result, config.max_comment_length, config.extreme_comment_length)
+    debug = config.debug
     return ComponentScores(
         has_backmatter=score_has_backmatter(parse_result),
         no_parse_errors=score_no_parse_errors(parse_result),
-        anchors_covered=score_anchors_covered(parse_result),
-        action_consistency=score_action_consistency(parse_result),
-        valid_categories=score_valid_categories(parse_result),
-        comment_length=score_comment_length(parse_result, config.get("max_comment_length", 100)),
-        no_duplicate_ids=score_no_duplicate_ids(parse_result)
+        anchors_covered=score_anchors_covered(parse_result, debug),
+        action_consistency=score_action_consistency(parse_result, scan, debug),
+        valid_categories=score_valid_categories(parse_result, scan, debug),
+        comment_length=score_comment_length(parse_result, config.max_comment_length, scan, debug),
+        no_duplicate_ids=score_no_duplicate_ids(parse_result, debug)
     )
 
-def compute_reward(parse_result: ParseResult, config: Dict) -> RewardBreakdown:
+def _gated_breakdown(parse_result: ParseResult, note: str) -> RewardBreakdown:
+    """Zero-reward breakdown with placeholder components, skipping edit scans."""
+    components = [
+        score_has_backmatter(parse_result),
+        score_no_parse_errors(parse_result),
+        ComponentScore("anchors_covered", 0.0),
+        ComponentScore("action_consistency", 0.0),
+        ComponentScore("valid_categories", 0.0),
+        ComponentScore("comment_length", 0.0),
+        ComponentScore("no_duplicate_ids", 0.0),
+    ]
+    return RewardBreakdown(parse_result, True, components, 0.0, [note])
+
+def compute_reward(parse_result: ParseResult, config: RewardConfig) -> RewardBreakdown:
     """
     Compute reward from parse result.
     
@@ -109,18 +128,22 @@ def compute_reward(parse_result: ParseResult, config: Dict) -> RewardBreakdown:
     1. Compute individual component scores
     2. Apply weights and compute final reward
     """
-    # Get individual component scores
-    scores = compute_component_scores(parse_result, config)
-    
-    # Check for extreme comment gating (needs parse_result access)
-    if config.get("gate_on_extreme_comments", True):
-        extreme_threshold = config.get("extreme_comment_length", 200)
-        for edit in parse_result.edits:
-            if len(edit.comment or "") > extreme_threshold:
-                return RewardBreakdown(
-                    parse_result, True, scores.to_list(), 0.0,
-                    [f"Gated due to extremely long comment (>{extreme_threshold} chars)"]
-                )
+    # Gated documents are common early in training; detect the O(1) parse
+    # error gate before doing any anchor/edit scanning
+    if config.gate_on_parse_errors and parse_result.errors:
+        return _gated_breakdown(parse_result, "Gated due to parse errors")
+
+    # One fused pass over the edits feeds both gating and scoring
+    scan = _scan_edits(parse_result, config.max_comment_length, config.extreme_comment_length)
+
+    # Check for extreme comment gating before the full component pass
+    if config.gate_on_extreme_comments and scan.any_extreme:
+        return _gated_breakdown(
+            parse_result,
+            f"Gated due to extremely long comment (>{config.extreme_comment_length} chars)"
+        )
+
+    scores = compute_component_scores(parse_result, config, scan)
     
     # Compute final weighted reward
     breakdown = scores.compute(config)
@@ -5,12 +5,134 @@ Uses the parser's built-in quality indicators directly.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Set
-from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
 from grammarlee import ParseResult
+from grammarlee.models import VALID_CATEGORIES
 
-@dataclass
+try:
+    import numpy as np
+except ImportError:  # numpy ships with the training stack but stays optional
+    np = None
+
+# Below this many edits the NumPy setup cost outweighs the C loops
+_NUMPY_MIN_EDITS = 32
+
+try:
+    import numba
+except ImportError:  # optional JIT; pure-Python path always works
+    numba = None
+
+if numba is not None and np is not None:
+    @numba.njit(cache=True)
+    def _count_kernel(consistent, valid, lengths, max_length, extreme_length):
+        c = v = r = 0
+        extreme = False
+        for i in range(lengths.shape[0]):
+            if consistent[i]:
+                c += 1
+            if valid[i]:
+                v += 1
+            length = lengths[i]
+            if length <= max_length:
+                r += 1
+            elif length > extreme_length:
+                extreme = True
+        return c, v, r, extreme
+
+    # Pay the JIT warm-up at import with a 1-element dummy, off the hot path
+    _count_kernel(np.zeros(1, np.bool_), np.zeros(1, np.bool_),
+                  np.zeros(1, np.int32), 100, 200)
+else:
+    _count_kernel = None
+
+
+class EditScan(NamedTuple):
+    """Accumulators from a single fused pass over pr.edits."""
+    consistent_count: int
+    valid_count: int
+    reasonable_count: int
+    lengths: List[int]
+    inconsistent_ids: List[int]
+    invalid: List[Tuple[int, str]]
+    too_long_ids: List[int]
+    any_extreme: bool
+
+
+def _scan_edits_jit(edits, max_length: int, extreme_length: int) -> EditScan:
+    """SoA + JIT variant of _scan_edits for GRPO-scale edit lists."""
+    n = len(edits)
+    consistent_arr = np.fromiter((e.consistency_ok for e in edits), np.bool_, n)
+    valid_arr = np.fromiter((e.category in VALID_CATEGORIES for e in edits), np.bool_, n)
+    length_arr = np.fromiter((len(e.comment or "") for e in edits), np.int32, n)
+
+    consistent_count, valid_count, reasonable_count, any_extreme = _count_kernel(
+        consistent_arr, valid_arr, length_arr, max_length, extreme_length)
+
+    # Offender lists are only materialized when something actually failed
+    inconsistent_ids: List[int] = []
+    invalid: List[Tuple[int, str]] = []
+    too_long_ids: List[int] = []
+    if consistent_count != n:
+        inconsistent_ids = [edits[i].id for i in np.nonzero(~consistent_arr)[0]]
+    if valid_count != n:
+        invalid = [(edits[i].id, edits[i].category) for i in np.nonzero(~valid_arr)[0]]
+    if reasonable_count != n:
+        too_long_ids = [edits[i].id for i in np.nonzero(length_arr > max_length)[0]]
+
+    return EditScan(int(consistent_count), int(valid_count), int(reasonable_count),
+                    length_arr.tolist(), inconsistent_ids, invalid, too_long_ids,
+                    bool(any_extreme))
+
+
+def _scan_edits(pr: ParseResult, max_length: int = 100, extreme_length: int = 200) -> EditScan:
+    """Collect every per-edit statistic the score functions need in one pass."""
+    edits = pr.edits
+    if _count_kernel is not None and len(edits) >= _NUMPY_MIN_EDITS:
+        return _scan_edits_jit(edits, max_length, extreme_length)
+    consistent_count = valid_count = reasonable_count = 0
+    lengths: List[int] = []
+    inconsistent_ids: List[int] = []
+    invalid: List[Tuple[int, str]] = []
+    too_long_ids: List[int] = []
+    any_extreme = False
+
+    # For large edit lists, push the length-and-compare work to NumPy
+    use_numpy = np is not None and len(edits) >= _NUMPY_MIN_EDITS
+
+    for e in edits:
+        if e.consistency_ok:
+            consistent_count += 1
+        else:
+            inconsistent_ids.append(e.id)
+        if e.category in VALID_CATEGORIES:  # direct C-level set lookup
+            valid_count += 1
+        else:
+            invalid.append((e.id, e.category))
+        if not use_numpy:
+            length = len(e.comment or "")
+            lengths.append(length)
+            if length <= max_length:
+                reasonable_count += 1
+            else:
+                too_long_ids.append(e.id)
+                if length > extreme_length:
+                    any_extreme = True
+
+    if use_numpy:
+        arr = np.fromiter((len(e.comment or "") for e in edits),
+                          dtype=np.int32, count=len(edits))
+        lengths = arr.tolist()
+        mask = arr <= max_length
+        reasonable_count = int(mask.sum())
+        if reasonable_count != len(edits):
+            too_long_ids = [edits[i].id for i in np.nonzero(~mask)[0]]
+            any_extreme = bool((arr > extreme_length).any())
+
+    return EditScan(consistent_count, valid_count, reasonable_count, lengths,
+                    inconsistent_ids, invalid, too_long_ids, any_extreme)
+
+@dataclass(slots=True)
 class ComponentScore:
     name: str
     value: float
@@ -30,18 +152,40 @@ def score_no_parse_errors(pr: ParseResult) -> ComponentScore:
     has_errors = len(pr.errors) > 0
     return ComponentScore("no_parse_errors", 0.0 if has_errors else 1.0)
 
-def score_anchors_covered(pr: ParseResult) -> ComponentScore:
+# Below this many IDs, scanning the lists directly beats building hash sets
+_SMALL_ID_LISTS = 8
+
+def score_anchors_covered(pr: ParseResult, debug: bool = True) -> ComponentScore:
     """Check if all anchors have corresponding edits."""
     if not pr.anchors:
+        if not debug:
+            return ComponentScore("anchors_covered", 1.0)
         return ComponentScore("anchors_covered", 1.0, {"anchor_ids": [], "edit_ids": []})
-    
-    anchor_ids = {a.id for a in pr.anchors}
-    edit_ids = {e.id for e in pr.edits}
-    
-    covered = len(anchor_ids & edit_ids)
-    total = len(anchor_ids)
+
+    anchor_ids = None
+    if len(pr.anchors) + len(pr.edits) <= _SMALL_ID_LISTS:
+        seen: List[int] = []
+        covered = 0
+        for a in pr.anchors:
+            if a.id in seen:
+                continue
+            seen.append(a.id)
+            if any(a.id == e.id for e in pr.edits):
+                covered += 1
+        total = len(seen)
+    else:
+        anchor_ids = {a.id for a in pr.anchors}
+        edit_ids = {e.id for e in pr.edits}
+        covered = len(anchor_ids & edit_ids)
+        total = len(anchor_ids)
+
     score = covered / total if total > 0 else 1.0
-    
+
+    if not debug:
+        return ComponentScore("anchors_covered", score)
+    if anchor_ids is None:  # small path skipped the sets; debug wants them
+        anchor_ids = {a.id for a in pr.anchors}
+        edit_ids = {e.id for e in pr.edits}
     return ComponentScore("anchors_covered", score, {
         "anchor_ids": sorted(anchor_ids),
         "edit_ids": sorted(edit_ids),
@@ -49,98 +193,112 @@ def score_anchors_covered(pr: ParseResult) -> ComponentScore:
         "total": total
     })
 
-def score_action_consistency(pr: ParseResult) -> ComponentScore:
+def score_action_consistency(pr: ParseResult, scan: Optional[EditScan] = None,
+                             debug: bool = True) -> ComponentScore:
     """Use parser's built-in action consistency check."""
     if not pr.edits:
         # If we have anchors but no edits, that's a fundamental failure
-        if pr.anchors:
-            return ComponentScore("action_consistency", 0.0, {"consistent_count": 0, "total": 0, "reason": "anchors_present_but_no_edits"})
-        else:
-            return ComponentScore("action_consistency", 1.0, {"consistent_count": 0, "total": 0, "reason": "no_anchors_no_edits"})
-    
-    consistent = sum(1 for e in pr.edits if e.consistency_ok)
+        value = 0.0 if pr.anchors else 1.0
+        if not debug:
+            return ComponentScore("action_consistency", value)
+        reason = "anchors_present_but_no_edits" if pr.anchors else "no_anchors_no_edits"
+        return ComponentScore("action_consistency", value, {"consistent_count": 0, "total": 0, "reason": reason})
+
+    if scan is None:
+        scan = _scan_edits(pr)
     total = len(pr.edits)
-    score = consistent / total
-    
+    score = scan.consistent_count / total
+
+    if not debug:
+        return ComponentScore("action_consistency", score)
     return ComponentScore("action_consistency", score, {
-        "consistent_count": consistent,
+        "consistent_count": scan.consistent_count,
         "total": total,
-        "inconsistent_ids": [e.id for e in pr.edits if not e.consistency_ok]
+        "inconsistent_ids": scan.inconsistent_ids
     })
 
-def score_valid_categories(pr: ParseResult) -> ComponentScore:
+def score_valid_categories(pr: ParseResult, scan: Optional[EditScan] = None,
+                           debug: bool = True) -> ComponentScore:
     """Use parser's built-in category validation."""
     if not pr.edits:
         # If we have anchors but no edits, that's a fundamental failure
-        if pr.anchors:
-            return ComponentScore("valid_categories", 0.0, {"valid_count": 0, "total": 0, "reason": "anchors_present_but_no_edits"})
-        else:
-            return ComponentScore("valid_categories", 1.0, {"valid_count": 0, "total": 0, "reason": "no_anchors_no_edits"})
-    
-    valid = sum(1 for e in pr.edits if e.is_valid_category)
+        value = 0.0 if pr.anchors else 1.0
+        if not debug:
+            return ComponentScore("valid_categories", value)
+        reason = "anchors_present_but_no_edits" if pr.anchors else "no_anchors_no_edits"
+        return ComponentScore("valid_categories", value, {"valid_count": 0, "total": 0, "reason": reason})
+
+    if scan is None:
+        scan = _scan_edits(pr)
     total = len(pr.edits)
-    score = valid / total
-    
+    score = scan.valid_count / total
+
+    if not debug:
+        return ComponentScore("valid_categories", score)
     return ComponentScore("valid_categories", score, {
-        "valid_count": valid,
+        "valid_count": scan.valid_count,
         "total": total,
-        "invalid": [(e.id, e.category) for e in pr.edits if not e.is_valid_category]
+        "invalid": scan.invalid
     })
 
 
 
-def score_comment_length(pr: ParseResult, max_length: int = 100) -> ComponentScore:
+def score_comment_length(pr: ParseResult, max_length: int = 100,
+                         scan: Optional[EditScan] = None, debug: bool = True) -> ComponentScore:
     """Penalize overly long comments."""
     if not pr.edits:
         # If we have anchors but no edits, that's a fundamental failure
-        if pr.anchors:
-            return ComponentScore("comment_length", 0.0, {"lengths": [], "max_length": max_length, "reason": "anchors_present_but_no_edits"})
-        else:
-            return ComponentScore("comment_length", 1.0, {"lengths": [], "max_length": max_length, "reason": "no_anchors_no_edits"})
-    
-    lengths = [len(e.comment or "") for e in pr.edits]
+        value = 0.0 if pr.anchors else 1.0
+        if not debug:
+            return ComponentScore("comment_length", value)
+        reason = "anchors_present_but_no_edits" if pr.anchors else "no_anchors_no_edits"
+        return ComponentScore("comment_length", value, {"lengths": [], "max_length": max_length, "reason": reason})
+
+    if scan is None:
+        scan = _scan_edits(pr, max_length)
     # Score based on how many are within reasonable length
-    reasonable = sum(1 for length in lengths if length <= max_length)
-    total = len(lengths)
-    score = reasonable / total
-    
+    total = len(pr.edits)
+    score = scan.reasonable_count / total
+
+    if not debug:
+        return ComponentScore("comment_length", score)
     return ComponentScore("comment_length", score, {
-        "lengths": lengths,
+        "lengths": scan.lengths,
         "max_length": max_length,
-        "reasonable_count": reasonable,
+        "reasonable_count": scan.reasonable_count,
         "total": total,
-        "too_long_ids": [e.id for e in pr.edits if len(e.comment or "") > max_length]
+        "too_long_ids": scan.too_long_ids
     })
 
-def score_no_duplicate_ids(pr: ParseResult) -> ComponentScore:
+def score_no_duplicate_ids(pr: ParseResult, debug: bool = True) -> ComponentScore:
     """Penalize duplicate IDs in anchors or edits."""
-    anchor_ids = [a.id for a in pr.anchors]
-    edit_ids = [e.id for e in pr.edits]
-    
-    anchor_counts = Counter(anchor_ids)
-    edit_counts = Counter(edit_ids)
-    
-    # Count unique IDs vs total IDs
-    unique_anchors = len(set(anchor_ids))
-    unique_edits = len(set(edit_ids))
-    total_anchors = len(anchor_ids)
-    total_edits = len(edit_ids)
-    
-    if total_anchors + total_edits == 0:
+    total_ids = len(pr.anchors) + len(pr.edits)
+    if total_ids == 0:
+        if not debug:
+            return ComponentScore("no_duplicate_ids", 1.0)
         return ComponentScore("no_duplicate_ids", 1.0, {"duplicates": []})
-    
-    total_unique = unique_anchors + unique_edits
-    total_ids = total_anchors + total_edits
-    score = total_unique / total_ids
-    
+
+    # Single pass per list: count occurrences and record each duplicate
+    # the first time it repeats
     duplicates = []
-    for id_, count in anchor_counts.items():
-        if count > 1:
-            duplicates.append(f"anchor_{id_}")
-    for id_, count in edit_counts.items():
-        if count > 1:
-            duplicates.append(f"edit_{id_}")
-    
+    anchor_seen: Dict[int, int] = {}
+    for a in pr.anchors:
+        count = anchor_seen.get(a.id, 0) + 1
+        anchor_seen[a.id] = count
+        if count == 2:
+            duplicates.append(f"anchor_{a.id}")
+    edit_seen: Dict[int, int] = {}
+    for e in pr.edits:
+        count = edit_seen.get(e.id, 0) + 1
+        edit_seen[e.id] = count
+        if count == 2:
+            duplicates.append(f"edit_{e.id}")
+
+    total_unique = len(anchor_seen) + len(edit_seen)
+    score = total_unique / total_ids
+
+    if not debug:
+        return ComponentScore("no_duplicate_ids", score)
     return ComponentScore("no_duplicate_ids", score, {
         "duplicates": duplicates,
         "total_unique": total_unique,
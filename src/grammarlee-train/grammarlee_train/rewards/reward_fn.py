@@ -3,83 +3,142 @@ Simple TRL-compatible reward function for GrammarLee.
 """
 
 from __future__ import annotations
-from typing import List, Dict, Optional
+import dataclasses
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
-from grammarlee import parse_document
+from grammarlee import ParseResult, parse_document
 from .weights import load_config
+from .components import ComponentScore
 from .aggregate import compute_reward, compute_component_scores
 
+
+class SingleEvaluation(NamedTuple):
+    """Detailed result of evaluate_single, cheaper to build than nested dicts."""
+    reward: float
+    gated: bool
+    notes: List[str]
+    components: Tuple[ComponentScore, ...]
+    parse_errors: List[str]
+    num_anchors: int
+    num_edits: int
+
+    def to_dict(self) -> Dict:
+        """Expand to the nested-dict shape, for JSON output or logging."""
+        return {
+            "reward": self.reward,
+            "gated": self.gated,
+            "notes": self.notes,
+            "components": {c.name: {"value": c.value, "details": c.details} for c in self.components},
+            "parse_errors": self.parse_errors,
+            "num_anchors": self.num_anchors,
+            "num_edits": self.num_edits,
+            # Individual scores for direct access
+            "individual_scores": {c.name: c.value for c in self.components},
+        }
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_cached(document: str) -> ParseResult:
+    """Parse a document, memoized on the exact document text.
+
+    GEPA/GRPO loops score the same (prompt, completion) pair repeatedly
+    across candidates and retries; caching skips the redundant reparse.
+    """
+    return parse_document(document)
+
 class GrammarLeeReward:
     """Simple reward function for GrammarLee training."""
-    
-    def __init__(self, config_path: Optional[str] = None):
+
+    def __init__(self, config_path: Optional[str] = None, max_workers: int = 32):
         self.config = load_config(config_path)
-    
+        self.max_workers = max_workers
+
+    def _score_one(self, prompt: str, completion_msgs: List[Dict]) -> float:
+        """Score a single (prompt, completion) pair, 0.0 on any error."""
+        # Extract generated backmatter
+        backmatter = ""
+        if completion_msgs and isinstance(completion_msgs[0], dict):
+            backmatter = completion_msgs[0].get("content", "")
+
+        # Combine into full document
+        document = f"{prompt.rstrip()}\n\n--- BACKMATTER ---\n{backmatter.strip()}\n"
+
+        # Parse and score
+        try:
+            parse_result = _parse_cached(document)
+            breakdown = compute_reward(parse_result, self.config)
+            return breakdown.reward
+        except Exception:
+            # On any error, give zero reward
+            return 0.0
+
     def __call__(self, *, prompts: List[str], completions: List[List[Dict]], **batch) -> List[float]:
         """
         TRL-compatible reward function.
-        
+
         Args:
             prompts: List of inline text (with anchors)
             completions: List of model completions (backmatter)
-            
+
         Returns:
             List of rewards in [0, 1]
         """
-        rewards = []
-        
+        # GRPO emits several generations per prompt and early in training
+        # many collapse to identical strings; score each unique pair once
+        # and scatter the result back.
+        keys = []
         for prompt, completion_msgs in zip(prompts, completions):
-            # Extract generated backmatter
-            backmatter = ""
+            content = ""
             if completion_msgs and isinstance(completion_msgs[0], dict):
-                backmatter = completion_msgs[0].get("content", "")
-            
-            # Combine into full document
-            document = f"{prompt.rstrip()}\n\n--- BACKMATTER ---\n{backmatter.strip()}\n"
-            
-            # Parse and score
-            try:
-                parse_result = parse_document(document)
-                breakdown = compute_reward(parse_result, self.config)
-                rewards.append(breakdown.reward)
-            except Exception:
-                # On any error, give zero reward
-                rewards.append(0.0)
-        
-        return rewards
-    
-    def evaluate_single(self, inline_text: str, backmatter: str) -> Dict:
-        """Evaluate a single example with detailed breakdown."""
+                content = completion_msgs[0].get("content", "")
+            keys.append((prompt, content))
+
+        uniq_idx: Dict[tuple, int] = {}
+        uniq_prompts: List[str] = []
+        uniq_completions: List[List[Dict]] = []
+        for i, key in enumerate(keys):
+            if key not in uniq_idx:
+                uniq_idx[key] = len(uniq_prompts)
+                uniq_prompts.append(prompts[i])
+                uniq_completions.append(completions[i])
+
+        # Score the deduplicated batch concurrently instead of serializing
+        # the per-example parse/score work.
+        if len(uniq_prompts) <= 1:
+            scores = [self._score_one(p, c) for p, c in zip(uniq_prompts, uniq_completions)]
+        else:
+            workers = min(self.max_workers, len(uniq_prompts))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # executor.map preserves input order
+                scores = list(executor.map(self._score_one, uniq_prompts, uniq_completions))
+
+        return [scores[uniq_idx[key]] for key in keys]
+
+    def evaluate_single(self, inline_text: str, backmatter: str) -> SingleEvaluation:
+        """Evaluate a single example with detailed breakdown.
+
+        Returns a SingleEvaluation; call .to_dict() for the nested-dict form.
+        """
         document = f"{inline_text.rstrip()}\n\n--- BACKMATTER ---\n{backmatter.strip()}\n"
-        parse_result = parse_document(document)
-        
-        # Get individual component scores
-        scores = compute_component_scores(parse_result, self.config)
-        
-        # Compute final weighted reward
-        breakdown = scores.compute(self.config)
-        breakdown.parse_result = parse_result
-        
-        return {
-            "reward": breakdown.reward,
-            "gated": breakdown.gated,
-            "notes": breakdown.notes,
-            "components": {c.name: {"value": c.value, "details": c.details} for c in breakdown.components},
-            "parse_errors": parse_result.errors,
-            "num_anchors": len(parse_result.anchors),
-            "num_edits": len(parse_result.edits),
-            # Individual scores for direct access
-            "individual_scores": {
-                "has_backmatter": scores.has_backmatter.value,
-                "no_parse_errors": scores.no_parse_errors.value,
-                "anchors_covered": scores.anchors_covered.value,
-                "action_consistency": scores.action_consistency.value,
-                "valid_categories": scores.valid_categories.value,
-                "comment_length": scores.comment_length.value,
-                "no_duplicate_ids": scores.no_duplicate_ids.value
-            }
-        }
+        parse_result = _parse_cached(document)
+
+        # One scoring pass; force debug so component details get populated
+        # even though the batched hot path skips them
+        config = dataclasses.replace(self.config, debug=True)
+        breakdown = compute_reward(parse_result, config)
+
+        return SingleEvaluation(
+            reward=breakdown.reward,
+            gated=breakdown.gated,
+            notes=breakdown.notes,
+            components=tuple(breakdown.components),
+            parse_errors=parse_result.errors,
+            num_anchors=len(parse_result.anchors),
+            num_edits=len(parse_result.edits),
+        )
 
-def make_reward_function(config_path: Optional[str] = None) -> GrammarLeeReward:
+def make_reward_function(config_path: Optional[str] = None, max_workers: int = 32) -> GrammarLeeReward:
     """Create a reward function."""
-    return GrammarLeeReward(config_path)
+    return GrammarLeeReward(config_path, max_workers=max_workers)
@@ -3,9 +3,22 @@ Simple configuration for GrammarLee rewards.
 """
 
 from __future__ import annotations
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Dict, Optional
-import yaml
+from typing import Dict, Optional, Tuple
+
+
+def _yaml():
+    """Import yaml on first use so the reward path doesn't pay for it.
+
+    Prefers the libyaml C bindings (~10x faster) when the wheel ships them.
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeLoader as Loader, SafeDumper as Dumper
+    return yaml, Loader, Dumper
 
 # Simple default configuration
 DEFAULT_CONFIG = {
@@ -14,7 +27,8 @@ DEFAULT_CONFIG = {
     "gate_on_extreme_comments": True,  # Gate on extremely long comments
     "max_comment_length": 100,
     "extreme_comment_length": 200,  # Gate threshold
-    
+    "debug": False,  # Populate per-component details dicts
+
     # Component weights - rebalanced for GRPO effectiveness
     "weights": {
         "has_backmatter": 0.1,
@@ -27,24 +41,86 @@ DEFAULT_CONFIG = {
     }
 }
 
-def load_config(config_path: Optional[str] = None) -> Dict:
+# Fixed component order, aligned with ComponentScores.to_list()
+COMPONENT_ORDER = (
+    "has_backmatter",
+    "no_parse_errors",
+    "anchors_covered",
+    "action_consistency",
+    "valid_categories",
+    "comment_length",
+    "no_duplicate_ids",
+)
+
+@dataclass(frozen=True, slots=True)
+class RewardConfig:
+    """Immutable reward configuration, loaded once and shared.
+
+    The weight vector is precomputed aligned with COMPONENT_ORDER so the
+    scoring hot path does attribute access and tuple iteration instead of
+    dict lookups.
+    """
+    gate_on_parse_errors: bool = True
+    gate_on_duplicate_ids: bool = False
+    gate_on_extreme_comments: bool = True
+    max_comment_length: int = 100
+    extreme_comment_length: int = 200
+    debug: bool = False
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_CONFIG["weights"]))
+    weight_vec: Tuple[float, ...] = ()
+    total_weight: float = 0.0
+
+    def __post_init__(self):
+        if not self.weight_vec:
+            vec = tuple(self.weights.get(name, 1.0) for name in COMPONENT_ORDER)
+            object.__setattr__(self, "weight_vec", vec)
+            object.__setattr__(self, "total_weight", sum(vec))
+
+# RewardConfig is immutable, so loads can be memoized per (path, mtime);
+# editing the YAML on disk naturally invalidates the entry
+_config_cache: Dict[Tuple[Optional[str], Optional[float]], RewardConfig] = {}
+
+def load_config(config_path: Optional[str] = None) -> RewardConfig:
     """Load configuration, merging with defaults."""
+    path = Path(config_path) if config_path else None
+    mtime = path.stat().st_mtime if path is not None and path.exists() else None
+
+    cache_key = (config_path, mtime)
+    cached = _config_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     config = DEFAULT_CONFIG.copy()
-    
-    if config_path:
-        path = Path(config_path)
-        if path.exists():
-            with path.open('r') as f:
-                user_config = yaml.safe_load(f) or {}
-            
-            # Simple merge - overwrite defaults
-            config.update(user_config)
-            if "weights" in user_config:
-                config["weights"].update(user_config["weights"])
-    
-    return config
-
-def save_config(config: Dict, output_path: str) -> None:
+    config["weights"] = DEFAULT_CONFIG["weights"].copy()
+
+    if path is not None and mtime is not None:
+        yaml, loader, _ = _yaml()
+        with path.open('r') as f:
+            user_config = yaml.load(f, Loader=loader) or {}
+
+        # Simple merge - overwrite defaults
+        config.update(user_config)
+        if "weights" in user_config:
+            config["weights"] = DEFAULT_CONFIG["weights"].copy()
+            config["weights"].update(user_config["weights"])
+
+    known = {f.name for f in fields(RewardConfig)}
+    result = RewardConfig(**{k: v for k, v in config.items() if k in known})
+    _config_cache[cache_key] = result
+    return result
+
+def save_config(config, output_path: str) -> None:
     """Save configuration to file."""
+    if isinstance(config, RewardConfig):
+        config = {
+            "gate_on_parse_errors": config.gate_on_parse_errors,
+            "gate_on_duplicate_ids": config.gate_on_duplicate_ids,
+            "gate_on_extreme_comments": config.gate_on_extreme_comments,
+            "max_comment_length": config.max_comment_length,
+            "extreme_comment_length": config.extreme_comment_length,
+            "debug": config.debug,
+            "weights": dict(config.weights),
+        }
+    yaml, _, dumper = _yaml()
     with open(output_path, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False)
+        yaml.dump(config, f, Dumper=dumper, default_flow_style=False)
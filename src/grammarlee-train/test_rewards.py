@@ -15,8 +15,9 @@ def test_perfect_case():
 [1] REPLACE "word" -> "term" [GRAMMAR](better choice)'''
     
     parse_result = parse_document(document)
-    scores = compute_component_scores(parse_result, load_config())
-    breakdown = scores.compute(load_config())
+    config = load_config()
+    scores = compute_component_scores(parse_result, config)
+    breakdown = scores.compute(config)
     
     assert breakdown.reward > 0.9, f"Expected high reward, got {breakdown.reward}"
     assert not breakdown.gated
@@ -34,8 +35,9 @@ def test_parse_errors():
 malformed backmatter'''
     
     parse_result = parse_document(document)
-    scores = compute_component_scores(parse_result, load_config())
-    breakdown = scores.compute(load_config())
+    config = load_config()
+    scores = compute_component_scores(parse_result, config)
+    breakdown = scores.compute(config)
     
     assert breakdown.gated, "Should be gated"
     assert breakdown.reward == 0.0, "Gated reward should be 0"
@@ -53,8 +55,9 @@ def test_missing_edits():
 '''
     
     parse_result = parse_document(document)
-    scores = compute_component_scores(parse_result, load_config())
-    breakdown = scores.compute(load_config())
+    config = load_config()
+    scores = compute_component_scores(parse_result, config)
+    breakdown = scores.compute(config)
     
     assert breakdown.reward < 0.4, f"Expected low reward, got {breakdown.reward}"
     assert scores.anchors_covered.value == 0.0, "Should have no coverage"
@@ -108,8 +111,9 @@ def test_realistic_example():
 [3] REPLACE "definately" -> "definitely" [SPELLING](common error)'''
     
     parse_result = parse_document(document)
-    scores = compute_component_scores(parse_result, load_config())
-    breakdown = scores.compute(load_config())
+    config = load_config()
+    scores = compute_component_scores(parse_result, config)
+    breakdown = scores.compute(config)
     
     assert breakdown.reward > 0.8, f"Expected high reward, got {breakdown.reward}"
     assert scores.anchors_covered.value == 1.0, "Should have full coverage"
@@ -2,17 +2,22 @@
 LLM Text Editor - A library for tracking and reviewing text changes made by LLMs.
 """
 
-from .models import Change, TextEditSession
+from .models import Change, TextEditSession, InlineAnchor, Edit, ParseResult
 from .editor import ChangeDetector
 from .html import HTMLCompiler
+from .parser import parse_document
 
 __version__ = "0.1.0"
 
 __all__ = [
     "Change",
-    "TextEditSession", 
+    "TextEditSession",
     "ChangeDetector",
-    "HTMLCompiler"
+    "HTMLCompiler",
+    "InlineAnchor",
+    "Edit",
+    "ParseResult",
+    "parse_document"
 ]
 
 
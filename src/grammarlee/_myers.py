@@ -0,0 +1,166 @@
+"""
+Myers O(ND) diff over token sequences.
+
+Implements the greedy forward/backward search with the linear-space
+middle-snake recursion from Myers (1986). Tokens are interned to small
+ints up front so the inner snake loops compare integers, not strings.
+Emits (tag, i1, i2, j1, j2) opcodes compatible with
+difflib.SequenceMatcher.get_opcodes(), so callers can swap it in
+without touching their opcode handling.
+
+For grammar-editing workloads the edit distance D is tiny relative to
+the token counts, which makes this an O(D * (N + M)) walk instead of
+SequenceMatcher's quadratic worst case on repetitive text.
+"""
+
+from __future__ import annotations
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+Opcode = Tuple[str, int, int, int, int]
+
+__all__ = ["diff_opcodes"]
+
+
+def _middle_snake(
+    a: Sequence[int], b: Sequence[int], alo: int, ahi: int, blo: int, bhi: int
+) -> Tuple[int, int, int, int, int]:
+    """Find the middle snake of the optimal path through a[alo:ahi] x b[blo:bhi].
+
+    Returns (d, x1, y1, x2, y2): the edit distance of the region and the
+    snake's absolute start/end coordinates.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta % 2 != 0
+    dmax = (n + m + 1) // 2 + 1
+    # V arrays indexed by diagonal k, shifted by dmax to stay non-negative
+    vf = [0] * (2 * dmax + 2)
+    vb = [0] * (2 * dmax + 2)
+
+    for d in range(dmax + 1):
+        # Forward search from (alo, blo)
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[k - 1 + dmax] < vf[k + 1 + dmax]):
+                x = vf[k + 1 + dmax]
+            else:
+                x = vf[k - 1 + dmax] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[k + dmax] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1):
+                if vf[k + dmax] + vb[delta - k + dmax] >= n:
+                    return (2 * d - 1, alo + x0, blo + y0, alo + x, blo + y)
+
+        # Backward search from (ahi, bhi)
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[k - 1 + dmax] < vb[k + 1 + dmax]):
+                x = vb[k + 1 + dmax]
+            else:
+                x = vb[k - 1 + dmax] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - x - 1] == b[bhi - y - 1]:
+                x += 1
+                y += 1
+            vb[k + dmax] = x
+            if not odd and -d <= delta - k <= d:
+                if vb[k + dmax] + vf[delta - k + dmax] >= n:
+                    return (2 * d, ahi - x, bhi - y, ahi - x0, bhi - y0)
+
+    raise AssertionError("middle snake not found")  # unreachable
+
+
+def _diff_rec(
+    a: Sequence[int],
+    b: Sequence[int],
+    alo: int,
+    ahi: int,
+    blo: int,
+    bhi: int,
+    matches: List[Tuple[int, int]],
+) -> None:
+    """Append the aligned (i, j) match points of a[alo:ahi] vs b[blo:bhi]."""
+    # Strip common prefix/suffix so the recursion only sees the edited core
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    tail: List[Tuple[int, int]] = []
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        tail.append((ahi, bhi))
+
+    if alo == ahi or blo == bhi:
+        # Pure insert/delete region: nothing aligns
+        matches.extend(reversed(tail))
+        return
+
+    d, x1, y1, x2, y2 = _middle_snake(a, b, alo, ahi, blo, bhi)
+    if d > 1:
+        _diff_rec(a, b, alo, x1, blo, y1, matches)
+        for x, y in zip(range(x1, x2), range(y1, y2)):
+            matches.append((x, y))
+        _diff_rec(a, b, x2, ahi, y2, bhi, matches)
+    elif ahi - alo < bhi - blo:
+        # D == 1 with one extra token in b: a is a subsequence of b
+        j = blo
+        for i in range(alo, ahi):
+            while b[j] != a[i]:
+                j += 1
+            matches.append((i, j))
+            j += 1
+    else:
+        # D == 1 with one extra token in a: b is a subsequence of a
+        i = alo
+        for j in range(blo, bhi):
+            while a[i] != b[j]:
+                i += 1
+            matches.append((i, j))
+            i += 1
+
+    matches.extend(reversed(tail))
+
+
+def diff_opcodes(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[Opcode]:
+    """Diff two token sequences into SequenceMatcher-style opcodes."""
+    # Intern tokens to ints: snake loops then do C-level int comparisons
+    ids: Dict[Hashable, int] = {}
+    a_ids = [ids.setdefault(tok, len(ids)) for tok in a]
+    b_ids = [ids.setdefault(tok, len(ids)) for tok in b]
+
+    matches: List[Tuple[int, int]] = []
+    _diff_rec(a_ids, b_ids, 0, len(a_ids), 0, len(b_ids), matches)
+
+    opcodes: List[Opcode] = []
+    ai = bi = 0
+    i = 0
+    mlen = len(matches)
+    while True:
+        if i < mlen:
+            x, y = matches[i]
+        else:
+            x, y = len(a_ids), len(b_ids)
+        if ai < x or bi < y:
+            if ai < x and bi < y:
+                tag = "replace"
+            elif ai < x:
+                tag = "delete"
+            else:
+                tag = "insert"
+            opcodes.append((tag, ai, x, bi, y))
+        if i >= mlen:
+            break
+        # Fold consecutive match points into one equal run
+        j = i
+        while j + 1 < mlen and matches[j + 1] == (matches[j][0] + 1, matches[j][1] + 1):
+            j += 1
+        ai, bi = matches[j][0] + 1, matches[j][1] + 1
+        opcodes.append(("equal", x, ai, y, bi))
+        i = j + 1
+
+    return opcodes
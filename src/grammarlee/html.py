@@ -5,6 +5,8 @@ HTML compilation for LLM text editing interface.
 from __future__ import annotations
 import html
 import os
+from functools import lru_cache
+from io import StringIO
 from typing import Optional
 from pathlib import Path
 
@@ -17,6 +19,43 @@ except ImportError:
 
 from .models import TextEditSession
 
+try:  # C encoder for the |tojson session payload; stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
+# Escaped length of each source character under html.escape(quote=True)
+_ESC_LEN = {'&': 5, '<': 4, '>': 4, '"': 6, "'": 6}
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    # Sorted keys match the stdlib default Jinja would otherwise use
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+
+
+@lru_cache(maxsize=16)
+def _get_env(templates_dir: str) -> Environment:
+    """One Environment per templates dir, shared across compiler instances.
+
+    Jinja's template cache lives on the Environment, so short-lived
+    HTMLCompiler objects (tests, one-shot renders) reuse compiled
+    templates instead of re-parsing them.
+    """
+    env = Environment(
+        loader=FileSystemLoader(templates_dir),
+        autoescape=True,
+        # Templates don't change while the process is alive; skip the
+        # loader's per-render mtime stat and keep compiled code around
+        auto_reload=False,
+        cache_size=400,
+    )
+    if orjson is not None:
+        # Route |tojson through orjson; Jinja still applies its own
+        # HTML-safety escapes (< > & ') on top of the dumps output
+        env.policies["json.dumps_function"] = _orjson_dumps
+        env.policies["json.dumps_kwargs"] = {}
+    return env
+
 
 class HTMLCompiler:
     """Compiles TextEditSession to HTML interface for review."""
@@ -38,10 +77,12 @@ class HTMLCompiler:
         if not self.templates_dir.exists():
             raise FileNotFoundError(f"Templates directory not found: {self.templates_dir}")
         
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.templates_dir)),
-            autoescape=True
-        )
+        self.env = _get_env(str(self.templates_dir))
+        # Compiled templates by name, bypassing even the env cache lookup
+        self._templates: dict = {}
+        # Compiled change-list snippet, loaded on first use so custom
+        # template dirs aren't required to provide it up front
+        self._list_template = None
     
     def compile_to_html(self, 
                        session: TextEditSession, 
@@ -70,86 +111,92 @@ class HTMLCompiler:
             'session_data': session.to_dict()  # Pass dict instead of JSON string
         }
         
-        template = self.env.get_template(template_name)
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self.env.get_template(template_name)
+            self._templates[template_name] = template
         return template.render(**template_data)
     
+    @staticmethod
+    def _escaped_original(session: TextEditSession):
+        """Escape session.original_text once, with an index offset map.
+
+        Returns (escaped, offsets) where offsets[i] is the position in the
+        escaped string corresponding to original index i; cached on the
+        session so re-rendering (review + diff views) doesn't re-escape.
+        """
+        cached = session._escape_cache
+        if cached is None:
+            text = session.original_text
+            escaped = html.escape(text)
+            offsets = [0] * (len(text) + 1)
+            pos = 0
+            esc_len = _ESC_LEN
+            for i, ch in enumerate(text):
+                offsets[i] = pos
+                pos += esc_len.get(ch, 1)
+            offsets[len(text)] = pos
+            cached = (escaped, offsets)
+            session._escape_cache = cached
+        return cached
+
     def _generate_text_with_changes(self, session: TextEditSession) -> str:
         """Generate HTML text with changes highlighted."""
         if not session.changes:
-            return html.escape(session.original_text)  # Show original when no changes
-        
-        result = []
+            # Show original when no changes
+            return self._escaped_original(session)[0]
+
+        escaped_full, off = self._escaped_original(session)
+        # StringIO grows geometrically in C; no intermediate list + join pass
+        buf = StringIO()
+        esc = html.escape  # local binding for the per-change loop
         last_pos = 0
-        
-        # Sort changes by position
-        sorted_changes = sorted(session.changes, key=lambda c: c.start_pos)
-        
-        for change in sorted_changes:
-            # Add text before this change (properly escaped)
+
+        # Changes are kept position-sorted by TextEditSession
+        for change in session.changes:
+            # Add text before this change (pre-escaped slice, O(1) per gap)
             if change.start_pos > last_pos:
-                result.append(html.escape(session.original_text[last_pos:change.start_pos]))
-            
+                buf.write(escaped_full[off[last_pos]:off[change.start_pos]])
+
             # Add the change (with proper escaping of content)
             if change.type == "insert":
-                result.append(
+                buf.write(
                     f'<span class="change insert" id="text-{change.id}" '
                     f'onclick="toggleChange({change.id}, \'accept\')">'
-                    f'{html.escape(change.revised)}</span>'
+                    f'{esc(change.revised)}</span>'
                 )
                 last_pos = change.start_pos  # No movement for inserts
             elif change.type == "delete":
-                result.append(
+                buf.write(
                     f'<span class="change delete" id="text-{change.id}" '
                     f'onclick="toggleChange({change.id}, \'reject\')">'
-                    f'{html.escape(change.original)}</span>'
+                    f'{esc(change.original)}</span>'
                 )
                 last_pos = change.end_pos
             elif change.type == "replace":
-                result.append(
+                buf.write(
                     f'<span class="change replace" id="text-{change.id}" '
                     f'onclick="toggleChange({change.id}, \'accept\')">'
-                    f'{html.escape(change.revised)}</span>'
+                    f'{esc(change.revised)}</span>'
                 )
                 last_pos = change.end_pos
-        
-        # Add remaining text (properly escaped)
+
+        # Add remaining text (pre-escaped slice)
         if last_pos < len(session.original_text):
-            result.append(html.escape(session.original_text[last_pos:]))
-        
-        return ''.join(result)
+            buf.write(escaped_full[off[last_pos]:])
+
+        return buf.getvalue()
     
     def _generate_changes_list_html(self, changes):
-        """Generate HTML list of changes."""
+        """Generate HTML list of changes.
+
+        Rendering goes through the compiled change_item.jinja snippet: one
+        template render per list instead of ~8 Python string formats per
+        change, with escaping handled by the environment's autoescape.
+        """
         if not changes:
             return "<p>No changes detected.</p>"
-        
-        changes_html = []
-        
-        for change in changes:
-            annotation_html = ""
-            if change.annotation:
-                annotation_html = f'<div class="annotation">{html.escape(change.annotation)}</div>'
-            
-            # Properly escape all text content
-            original_text = html.escape(change.original) if change.original else "<em>none</em>"
-            revised_text = html.escape(change.revised) if change.revised else "<em>deleted</em>"
-            
-            change_html = f"""
-            <div class="change-item" id="change-{change.id}">
-                <div class="change-header">
-                    <span class="change-type {change.type}">{change.type}</span>
-                    <div class="change-buttons">
-                        <button class="btn accept" onclick="toggleChange({change.id}, 'accept')">Accept</button>
-                        <button class="btn reject" onclick="toggleChange({change.id}, 'reject')">Reject</button>
-                    </div>
-                </div>
-                <div class="change-text">
-                    <div class="original">Original: {original_text}</div>
-                    <div class="revised">Revised: {revised_text}</div>
-                </div>
-                {annotation_html}
-            </div>
-            """
-            changes_html.append(change_html)
-        
-        return '\n'.join(changes_html)
+
+        if self._list_template is None:
+            self._list_template = self.env.get_template("change_item.jinja")
+        return self._list_template.render(changes=changes)
@@ -118,7 +118,7 @@ def reward_function(example, prediction, trace=None, pred_name=None, pred_trace=
     return dspy.Prediction(score=combined_score, feedback=feedback)
 
 
-def optimize_with_gepa(train_set, val_set):
+def optimize_with_gepa(train_set, val_set, num_threads=8):
     # Configure main LM
     lm = dspy.LM(
         os.getenv("MODEL_ID", "openrouter/google/gemini-2.0-flash-001"),
@@ -137,8 +137,14 @@ def optimize_with_gepa(train_set, val_set):
         max_tokens=32000,
     )
 
+    # Evaluating candidates against the val set is the wall-clock bottleneck;
+    # each metric call is a blocking LLM round trip, so fan them out.
     optimizer = dspy.GEPA(
-        metric=reward_function, auto="medium", reflection_lm=reflection_lm, seed=42
+        metric=reward_function,
+        auto="medium",
+        reflection_lm=reflection_lm,
+        seed=42,
+        num_threads=num_threads,
     )
 
     # Just return the ChainOfThought directly - no wrapper needed
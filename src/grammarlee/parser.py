@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import re
 import difflib
+import sys
+from functools import lru_cache
 from typing import Iterator, List, Tuple, Any, Optional
 
 from .models import InlineAnchor, ParseResult, Edit  # keep your own models
@@ -12,6 +14,8 @@ __all__ = [
     "iter_inline_matches",
     "parse_inline_anchors",
     "apply_inline",
+    "split_sections",
+    "parse_backmatter",
     "parse_document",
 ]
 
@@ -19,29 +23,41 @@ __all__ = [
 # Inline anchors (depth-aware):
 #   [new text::ID] -> replace/insert
 #   [::ID]         -> delete (empty replacement)
+#
+# Groups: new = replacement text (no brackets), id = positive integer ID.
 # --------------------------------------------------------------------
-INLINE_TOKEN_RE = re.compile(
-    r"""
-    \[
-      (?P<new>[^\[\]]*?)      # new text (no brackets)
-      ::
-      (?P<id>[1-9]\d*)        # positive integer ID
-    \]
-    """,
-    re.VERBOSE,
-)
+# Greedy class: the '::digits]' tail pins the split uniquely, so lazy
+# matching only added backtracking steps on long replacement payloads
+_INLINE_PATTERN = r"\[(?P<new>[^\[\]]*)::(?P<id>[1-9]\d*)\]"
+
+try:
+    # google-re2 compiles to a DFA with guaranteed linear-time matching;
+    # LLM responses are parsed with this pattern on every reward call
+    import re2 as _re2
+    INLINE_TOKEN_RE = _re2.compile(_INLINE_PATTERN)
+except ImportError:
+    # IDs are ASCII digits; skip Unicode tables
+    INLINE_TOKEN_RE = re.compile(_INLINE_PATTERN, re.ASCII)
+
+
+# One compiled alternation + dispatch table: a single linear pass over the
+# string instead of six chained str.replace scans
+_ESC_RE = re.compile(r"\\([\\\"'nrt])")
+_ESC_MAP = {"\\": "\\", '"': '"', "'": "'", "n": "\n", "r": "\r", "t": "\t"}
 
 
 def _unescape_minimal(s: str) -> str:
-    # keep your unescape semantics here
-    return (
-        s.replace(r"\\", "\\")
-        .replace(r"\"", '"')
-        .replace(r"\'", "'")
-        .replace(r"\n", "\n")
-        .replace(r"\r", "\r")
-        .replace(r"\t", "\t")
-    )
+    # memchr guard: most payloads carry no escapes, so skip the regex
+    # machinery (and its same-string copy) entirely for them
+    if "\\" not in s:
+        return s
+    return _ESC_RE.sub(lambda m: _ESC_MAP[m.group(1)], s)
+
+
+# Shared anchor-kind constants: every anchor points at one of these two
+# interned strings, so downstream kind checks compare by identity
+_KIND_DELETE = sys.intern("delete")
+_KIND_REPLACE = sys.intern("replace_or_insert")
 
 
 def iter_inline_matches(s: str) -> Iterator[re.Match]:
@@ -49,35 +65,118 @@ def iter_inline_matches(s: str) -> Iterator[re.Match]:
     Yield INLINE_TOKEN_RE matches only at bracket-depth 0.
     Prevents false positives like '[a[b::1]'.
     """
+    # Jump between brackets with str.find (a C memchr scan) instead of a
+    # per-character Python loop; text between brackets costs nothing
+    find = s.find
     i, n, depth = 0, len(s), 0
     while i < n:
-        ch = s[i]
-        if ch == "[":
-            if depth == 0:
-                m = INLINE_TOKEN_RE.match(s, i)
-                if m:
-                    yield m
-                    i = m.end()
-                    continue
-            depth += 1
-        elif ch == "]":
-            depth = max(0, depth - 1)
-        i += 1
+        if depth == 0:
+            # ']' at depth 0 is a no-op, so only '[' matters here
+            j = find("[", i)
+            if j < 0:
+                return
+            m = INLINE_TOKEN_RE.match(s, j)
+            if m:
+                yield m
+                i = m.end()
+            else:
+                depth = 1
+                i = j + 1
+        else:
+            # Inside unmatched brackets: next '[' or ']' decides the depth
+            jc = find("]", i)
+            if jc < 0:
+                return  # never closes; no depth-0 region remains
+            jo = find("[", i)
+            if 0 <= jo < jc:
+                depth += 1
+                i = jo + 1
+            else:
+                depth -= 1
+                i = jc + 1
 
 
-def parse_inline_anchors(inline_text: str) -> List[InlineAnchor]:
+def _scan_inline(
+    inline_text: str,
+    edit_map: Optional[dict] = None,
+) -> Tuple[List[InlineAnchor], str, Optional[str]]:
+    """
+    One fused pass over the inline text: collect anchors, render the final
+    text, and - when an id -> old-text map is given - reconstruct the
+    original text as a third output channel of the same walk.
+
+    Parse-only scans (no edit_map) are memoized on the exact input text:
+    re-validation loops and tests parse the same edited_text repeatedly.
+    Callers get a fresh anchors list each time; the anchor objects
+    themselves are shared and treated as read-only downstream.
+    """
+    if edit_map is None:
+        anchors, final = _scan_inline_cached(inline_text)
+        return list(anchors), final, None
+    return _scan_inline_uncached(inline_text, edit_map)
+
+
+@lru_cache(maxsize=1024)
+def _scan_inline_cached(inline_text: str) -> Tuple[Tuple[InlineAnchor, ...], str]:
+    anchors, final, _ = _scan_inline_uncached(inline_text, None)
+    return tuple(anchors), final
+
+
+def _scan_inline_uncached(
+    inline_text: str,
+    edit_map: Optional[dict],
+) -> Tuple[List[InlineAnchor], str, Optional[str]]:
+    # Anchor-free text (the common case in reward loops) needs no state
+    # machine, list buffers, or join - just the trailing-newline strip
+    if "[" not in inline_text:
+        final = inline_text.rstrip("\r\n")
+        return [], final, (final if edit_map is not None else None)
+
     anchors: List[InlineAnchor] = []
+    out: List[str] = []
+    rec: Optional[List[str]] = None if edit_map is None else []
+    add_anchor = anchors.append
+    emit = out.append
+    last = 0
     for m in iter_inline_matches(inline_text):
         new = m.group("new")
-        anchors.append(
+        anchor_id = int(m.group("id"))
+        add_anchor(
             InlineAnchor(
-                id=int(m.group("id")),
-                kind="delete" if new == "" else "replace_or_insert",
+                id=anchor_id,
+                kind=_KIND_DELETE if new == "" else _KIND_REPLACE,
                 new_text=new,  # keep raw; unescape later
                 span=m.span(),
             )
         )
-    return anchors
+        gap = inline_text[last : m.start()]
+        emit(gap)
+        emit(_unescape_minimal(new))  # empty => delete
+        if rec is not None:
+            rec.append(gap)
+            # Missing IDs fall back to the new text; the ID-match check
+            # in parse_document reports them
+            rec.append(_unescape_minimal(edit_map.get(anchor_id, new)))
+        last = m.end()
+    # Strip trailing CRLF from the tail slice instead of rescanning the
+    # joined result; the endswith guard covers substituted text that
+    # itself ends in a newline
+    tail = inline_text[last:].rstrip("\r\n")
+    emit(tail)
+    final = "".join(out)
+    if final.endswith(("\n", "\r")):
+        final = final.rstrip("\r\n")
+    if rec is None:
+        return anchors, final, None
+    rec.append(tail)
+    reconstructed = "".join(rec)
+    if reconstructed.endswith(("\n", "\r")):
+        reconstructed = reconstructed.rstrip("\r\n")
+    return anchors, final, reconstructed
+
+
+def parse_inline_anchors(inline_text: str) -> List[InlineAnchor]:
+    return _scan_inline(inline_text)[0]
 
 
 def apply_inline(inline_text: str) -> str:
@@ -86,44 +185,47 @@ def apply_inline(inline_text: str) -> str:
       - replace/insert -> unescaped new text
       - delete         -> empty string
     """
-    out: List[str] = []
-    last = 0
-    for m in iter_inline_matches(inline_text):
-        out.append(inline_text[last : m.start()])
-        out.append(_unescape_minimal(m.group("new")))  # empty => delete
-        last = m.end()
-    out.append(inline_text[last:])
-    return "".join(out).rstrip("\r\n")
+    return _scan_inline(inline_text)[1]
 
 
-def apply_inline_with_old_text(inline_text: str, edits: List[Edit]) -> str:
+def apply_inline_with_old_text(
+    inline_text: str,
+    edits: List[Edit],
+    edit_map: Optional[dict] = None,
+) -> str:
     """
     Render inline anchors by substituting with "old" text from edit operations.
     This reconstructs what the original text should have been.
-    """
-    # Create a mapping from edit ID to old text
-    edit_map = {edit.id: edit.old for edit in edits}
 
-    out: List[str] = []
-    last = 0
-    for m in iter_inline_matches(inline_text):
-        anchor_id = int(m.group("id"))
-        out.append(inline_text[last : m.start()])
+    Callers holding a ParseResult can pass its cached `edit_map` to skip
+    rebuilding the mapping.
+    """
+    if edit_map is None:
+        edit_map = {edit.id: edit.old for edit in edits}
+    return _scan_inline(inline_text, edit_map)[2]
 
-        if anchor_id in edit_map:
-            # Use the old text from the corresponding edit
-            out.append(_unescape_minimal(edit_map[anchor_id]))
-        else:
-            # Fallback: if no edit found, this will be caught as an error elsewhere
-            out.append(_unescape_minimal(m.group("new")))
 
-        last = m.end()
-    out.append(inline_text[last:])
-    return "".join(out).rstrip("\r\n")
+# Above this size, diff only a window around the first mismatch; a full
+# unified_diff of two long near-identical documents is quadratic-ish work
+# for an error string nobody reads past the first hunk
+_DIFF_FULL_LIMIT = 8192
+_DIFF_WINDOW = 200
 
 
 def _generate_diff_message(original: str, reconstructed: str) -> str:
     """Generate a helpful diff message showing where texts don't match."""
+    if len(original) > _DIFF_FULL_LIMIT and len(reconstructed) > _DIFF_FULL_LIMIT:
+        # First differing index via cheap per-char compare of the shared
+        # prefix; both slices around it stay small for unified_diff
+        limit = min(len(original), len(reconstructed))
+        i = next(
+            (k for k in range(limit) if original[k] != reconstructed[k]), limit
+        )
+        lo = max(0, i - _DIFF_WINDOW)
+        hi = i + _DIFF_WINDOW
+        original = original[lo:hi]
+        reconstructed = reconstructed[lo:hi]
+
     original_lines = original.splitlines(keepends=True)
     reconstructed_lines = reconstructed.splitlines(keepends=True)
 
@@ -146,52 +248,206 @@ def _generate_diff_message(original: str, reconstructed: str) -> str:
         return f"Text mismatch: original length={len(original)}, reconstructed length={len(reconstructed)}"
 
 
+# --------------------------------------------------------------------
+# Backmatter:
+#   --- BACKMATTER ---
+#   [1] REPLACE "old" -> "new" [CATEGORY](comment)
+# --------------------------------------------------------------------
+_DELIM = "--- BACKMATTER ---"
+
+BACKMATTER_LINE_RE = re.compile(
+    r"""
+    \[(?P<id>[1-9]\d*)\]
+    \s+(?P<action>REPLACE|INSERT|DELETE)
+    \s+"(?P<old>(?:[^"\\]|\\.)*)"
+    \s*->\s*"(?P<new>(?:[^"\\]|\\.)*)"
+    \s+\[(?P<category>[A-Z]+)\]
+    \((?P<comment>[^)]*)\)
+    """,
+    re.VERBOSE | re.ASCII,  # the backmatter grammar itself is ASCII-only
+)
+
+# Whole-buffer variant of the line grammar: one finditer descent over the
+# backmatter instead of splitlines + per-line fullmatch. Whitespace inside
+# a line is restricted to spaces/tabs so a match can never span lines the
+# per-line parser would have rejected. Only usable when every non-blank
+# line matches; parse_backmatter checks that.
+_BM_SCAN_RE = re.compile(
+    r"""
+    ^[ \t]*
+    \[(?P<id>[1-9]\d*)\]
+    [ \t]+(?P<action>REPLACE|INSERT|DELETE)
+    [ \t]+"(?P<old>(?:[^"\\\n]|\\.)*)"
+    [ \t]*->[ \t]*"(?P<new>(?:[^"\\\n]|\\.)*)"
+    [ \t]+\[(?P<category>[A-Z]+)\]
+    \((?P<comment>[^)\n]*)\)
+    [ \t]*\r?$
+    """,
+    re.VERBOSE | re.ASCII | re.MULTILINE,
+)
+
+
+def split_sections(document: str) -> Tuple[str, str]:
+    """
+    Split a full document into (inline_text, backmatter_text) on the
+    '--- BACKMATTER ---' delimiter line. Without a delimiter the whole
+    document is inline text and the backmatter is empty.
+    """
+    # Locate the fixed delimiter with str.find (C-level substring scan),
+    # then verify it sits alone on its line, allowing spaces/tabs around it
+    idx = document.find(_DELIM)
+    while idx >= 0:
+        line_start = document.rfind("\n", 0, idx) + 1
+        line_end = document.find("\n", idx + len(_DELIM))
+        if line_end < 0:
+            line_end = len(document)
+        before = document[line_start:idx]
+        after = document[idx + len(_DELIM) : line_end]
+        if not before.strip(" \t") and not after.strip(" \t"):
+            return document[:line_start], document[line_end:].lstrip("\r\n")
+        idx = document.find(_DELIM, idx + 1)
+    return document, ""
+
+
+def parse_backmatter(backmatter_text: str) -> Tuple[List[Edit], List[str]]:
+    """
+    Parse backmatter lines into Edit objects.
+
+    Returns (edits, errors); malformed non-empty lines are reported as
+    errors rather than raising.
+    """
+    # Documents without a backmatter section (the usual no-edit case)
+    # skip the scan entirely
+    if not backmatter_text or backmatter_text.isspace():
+        return [], []
+
+    # Fast path: one multiline finditer over the whole buffer. Valid if
+    # the text between consecutive matches is pure whitespace - i.e.
+    # every non-blank line parsed. Malformed input falls back to the
+    # per-line loop, which is the one that can name the offending lines.
+    matches = list(_BM_SCAN_RE.finditer(backmatter_text))
+    last = 0
+    clean = True
+    for m in matches:
+        gap = backmatter_text[last : m.start()]
+        if gap and not gap.isspace():
+            clean = False
+            break
+        last = m.end()
+    if clean:
+        tail = backmatter_text[last:]
+        clean = not tail or tail.isspace()
+    if clean:
+        return [_edit_from_match(m) for m in matches], []
+
+    edits: List[Edit] = []
+    errors: List[str] = []
+    for line in backmatter_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        m = BACKMATTER_LINE_RE.fullmatch(stripped)
+        if not m:
+            errors.append(f"Unparseable backmatter line: {stripped!r}")
+            continue
+        edits.append(_edit_from_match(m))
+    return edits, errors
+
+
+def _edit_from_match(m: re.Match) -> Edit:
+    """Build an Edit from a BACKMATTER_LINE_RE-shaped match."""
+    return Edit(
+        id=int(m.group("id")),
+        old=_unescape_minimal(m.group("old")),
+        new=_unescape_minimal(m.group("new")),
+        category=sys.intern(m.group("category")),
+        comment=m.group("comment").strip(),
+        # Interned like category: consistency_ok compares actions
+        # against literals, which hit the pointer-equality fast path
+        action=sys.intern(m.group("action")),
+    )
+
+
 # --------------------------------------------------------------------
 # Public entry point used by tests/callers
 # --------------------------------------------------------------------
 def parse_document(pred: Any, original_text: Optional[str] = None) -> ParseResult:
     """
-    Build a ParseResult from a prediction-like object.
+    Build a ParseResult from a prediction-like object or a full document string.
+
+    A string `pred` is treated as a complete document: the inline section and
+    backmatter are split on the '--- BACKMATTER ---' delimiter and edits are
+    parsed from the backmatter lines.
 
-    Expected attributes on `pred`:
+    Otherwise, expected attributes on `pred`:
       - edited_text: str     (required)
       - edits: List[Edit]    (optional; default empty)
       - backmatter_text: str (optional; default "")
 
     Args:
-        pred: Prediction object with edited_text and edits
+        pred: Prediction object with edited_text and edits, or document string
         original_text: Optional original text to validate against. If provided,
                       will check that anchors can be reversed to reconstruct the original.
     """
-    inline_text: str = getattr(pred, "edited_text", "") or ""
-    edits: List[Edit] = list(getattr(pred, "edits", []) or [])
-    backmatter_text: str = getattr(pred, "backmatter_text", "") or ""
+    parse_errors: List[str] = []
+    if isinstance(pred, str):
+        inline_text, backmatter_text = split_sections(pred)
+        edits, parse_errors = parse_backmatter(backmatter_text)
+    else:
+        inline_text = getattr(pred, "edited_text", "") or ""
+        edits = list(getattr(pred, "edits", []) or [])
+        backmatter_text = getattr(pred, "backmatter_text", "") or ""
 
-    anchors = parse_inline_anchors(inline_text)
-    final_text = apply_inline(inline_text)
+    # Build the id -> old-text map only when reconstruction will run, and
+    # feed it to the fused scan so the final text and the reconstructed
+    # original come out of one walk over inline_text
+    edit_map = (
+        {e.id: e.old for e in edits}
+        if original_text is not None and edits
+        else None
+    )
+    anchors, final_text, reconstructed_text = _scan_inline(inline_text, edit_map)
 
-    errors: List[str] = []
-    anchor_ids = {a.id for a in anchors}
-    edit_ids = {e.id for e in edits} if edits else set()
+    errors: List[str] = list(parse_errors)
 
-    if edits and (len(anchors) != len(edits)):
-        errors.append("Edits not matching anchors.")
-    if edits and (anchor_ids != edit_ids):
-        errors.append("Anchor IDs not matched.")
+    if edits:
+        if len(anchors) != len(edits):
+            # A count mismatch already fails the prediction; don't spend
+            # a second pass proving the ID multisets differ too
+            errors.append("Edits not matching anchors.")
+        else:
+            # IDs are small positive ints in practice, so compare them as
+            # bits in a single integer instead of building two sets; fall
+            # back to sets if an ID is large enough to make the mask
+            # expensive
+            a_mask = 0
+            for a in anchors:
+                if a.id >= 1024:
+                    a_mask = -1
+                    break
+                a_mask |= 1 << a.id
+            e_mask = 0
+            if a_mask != -1:
+                for e in edits:
+                    if e.id >= 1024:
+                        e_mask = -1
+                        break
+                    e_mask |= 1 << e.id
+            if a_mask == -1 or e_mask == -1:
+                mismatched = {a.id for a in anchors} != {e.id for e in edits}
+            else:
+                mismatched = a_mask != e_mask
+            if mismatched:
+                errors.append("Anchor IDs not matched.")
 
     # New validation: check if we can reconstruct the original text
-    if original_text is not None and edits:
-        try:
-            reconstructed_text = apply_inline_with_old_text(inline_text, edits)
-            if reconstructed_text != original_text:
-                diff_message = _generate_diff_message(original_text, reconstructed_text)
-                errors.append(
-                    f"Failed to reconstruct original text from edits. {diff_message}"
-                )
-        except Exception as e:
-            errors.append(f"Error during original text reconstruction: {str(e)}")
-
-    return ParseResult(
+    if reconstructed_text is not None and reconstructed_text != original_text:
+        diff_message = _generate_diff_message(original_text, reconstructed_text)
+        errors.append(
+            f"Failed to reconstruct original text from edits. {diff_message}"
+        )
+
+    result = ParseResult(
         inline_text=inline_text,
         backmatter_text=backmatter_text,
         final_text=final_text,
@@ -199,3 +455,7 @@ def parse_document(pred: Any, original_text: Optional[str] = None) -> ParseResul
         edits=edits,
         errors=errors,
     )
+    if edit_map is not None:
+        # Seed the lazy map so later reconstruction calls reuse this one
+        result._edit_map_cache = edit_map
+    return result
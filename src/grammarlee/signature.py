@@ -2,18 +2,7 @@ import dspy
 
 from typing import Literal, List
 
-from .models import Edit
-
-
-VALID_CATEGORIES = [
-    "GRAMMAR",
-    "SPELLING",
-    "PUNCTUATION",
-    "STYLE",
-    "CLARITY",
-    "WORD",
-    "WORDINESS",
-]
+from .models import Edit, VALID_CATEGORIES
 
 
 class GrammarLeeSignature(dspy.Signature):